@@ -9,12 +9,14 @@ _BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _BACKEND_ROOT not in sys.path:
     sys.path.insert(0, _BACKEND_ROOT)
 
-import asyncio, time, json, logging, re
+import asyncio, time, json, logging, random
 from datetime import datetime
+
+import orjson
 from typing import Optional
 from uuid import UUID
 
-from groq import Groq, RateLimitError, APIError, APITimeoutError
+from groq import AsyncGroq, RateLimitError, APIError, APITimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
@@ -71,6 +73,14 @@ STEP 8: Return ONLY the final JSON — no other text
 Confidence: 9-10=complete, 7-8=minor gaps, 5-6=significant gaps, 1-4=very limited"""
 
 
+# Context budget for the agentic loop: every past tool result is re-sent on
+# each iteration, so input tokens grow O(iter^2) without a cap. Fresh tool
+# results are clipped to ~1500 chars; results older than two iterations are
+# collapsed to a one-line stub since the model has already consumed them.
+TOOL_RESULT_MAX_CHARS = 1500
+TOOL_RESULT_STUB_CHARS = 120
+
+
 class EnrichmentAgent:
     MODELS = {
         "best":    "llama-3.3-70b-versatile",
@@ -85,7 +95,10 @@ class EnrichmentAgent:
                 "No Groq API key found. Set GROQ_API_KEY=gsk_... or API_KEY=gsk_... in your .env file.\n"
                 "Get a free key at https://console.groq.com"
             )
-        self.client = Groq(api_key=resolved_key)
+        # Native async client (httpx under the hood) — no thread-pool bounce
+        # per LLM call. SDK retries are disabled; _call_groq_with_retry owns
+        # backoff so waits stay jittered and observable.
+        self.client = AsyncGroq(api_key=resolved_key, timeout=60.0, max_retries=0)
         self.model = self.MODELS.get(model_tier, self.MODELS["best"])
         self.max_iterations = settings.GROQ_MAX_TOOL_ITERATIONS
         self.max_retries = 3
@@ -99,10 +112,13 @@ class EnrichmentAgent:
         organization_id: UUID,
         company_name: str,
         website_hint: Optional[str] = None,
-        extra_context: Optional[dict] = None
+        extra_context: Optional[dict] = None,
+        commit: bool = True,
+        save_lock: Optional[asyncio.Lock] = None,
     ) -> EnrichmentResult:
         start_time = time.time()
         total_tokens = 0
+        cached_tokens = 0
         tool_calls_count = 0
         final_text = ""
         iteration = 0
@@ -116,20 +132,26 @@ class EnrichmentAgent:
             for k, v in extra_context.items():
                 user_content += f"\n{k}: {v}"
 
+        # Groq caches prompt prefixes automatically (no Anthropic-style
+        # cache_control markers), so keep the ~900-token system prompt as the
+        # byte-identical first message on every iteration — each re-send after
+        # the first is billed at the cached-read rate.
         messages = [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user",   "content": user_content}
         ]
+        tool_msg_log = []  # (iteration, index into messages) per tool result
 
         while iteration < self.max_iterations:
             iteration += 1
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, lambda m=messages: self._call_groq_with_retry(m))
+            response = await self._call_groq_with_retry(messages)
             if response is None:
                 break
 
             if response.usage:
                 total_tokens += (response.usage.prompt_tokens or 0) + (response.usage.completion_tokens or 0)
+                details = getattr(response.usage, "prompt_tokens_details", None)
+                cached_tokens += getattr(details, "cached_tokens", 0) or 0
 
             choice = response.choices[0]
             finish_reason = choice.finish_reason
@@ -150,19 +172,38 @@ class EnrichmentAgent:
                         for tc in msg.tool_calls
                     ]
                 })
+                # Parse args up front so a malformed payload fails in isolation,
+                # then await every tool concurrently: the batch costs
+                # max(latency) instead of sum(latencies).
+                parsed = []
                 for tc in msg.tool_calls:
                     tool_calls_count += 1
                     try:
-                        args = json.loads(tc.function.arguments)
-                    except json.JSONDecodeError:
+                        args = orjson.loads(tc.function.arguments) if tc.function.arguments else {}
+                    except orjson.JSONDecodeError:
                         args = {}
                     logger.info(f"  → {tc.function.name}({list(args.keys())})")
-                    result = execute_tool(tc.function.name, args)
+                    parsed.append((tc, args))
+                results = await asyncio.gather(*[
+                    execute_tool(tc.function.name, args) for tc, args in parsed
+                ])
+                for (tc, _), result in zip(parsed, results):
+                    content = str(result)
+                    if len(content) > TOOL_RESULT_MAX_CHARS:
+                        content = content[:TOOL_RESULT_MAX_CHARS] + "...[truncated]"
+                    tool_msg_log.append((iteration, len(messages)))
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tc.id,
-                        "content": str(result)
+                        "content": content
                     })
+                # Sliding window: collapse tool results older than two
+                # iterations to a stub — the model already read them in full.
+                for it, idx in tool_msg_log:
+                    if it <= iteration - 2 and len(messages[idx]["content"]) > TOOL_RESULT_STUB_CHARS:
+                        messages[idx]["content"] = (
+                            messages[idx]["content"][:TOOL_RESULT_STUB_CHARS] + "...[older result elided]"
+                        )
             else:
                 if msg.content:
                     final_text = msg.content
@@ -170,32 +211,94 @@ class EnrichmentAgent:
 
         processing_time_ms = int((time.time() - start_time) * 1000)
 
-        result = await self._save_result(
-            db, job_id, organization_id, company_name,
-            final_text, self.model, total_tokens, tool_calls_count, processing_time_ms
-        )
-
-        usage_log = UsageLog(
-            organization_id=organization_id, job_id=job_id,
-            action="enrichment", credits_consumed=1,
-            tokens_used=total_tokens, model_used=self.model,
-            extra_data={
-                "company": company_name, "tool_calls": tool_calls_count,
-                "iterations": iteration, "confidence": result.confidence_score,
-                "processing_ms": processing_time_ms, "status": result.status
-            }
-        )
-        db.add(usage_log)
-        await db.commit()
+        async def _persist() -> EnrichmentResult:
+            result = await self._save_result(
+                db, job_id, organization_id, company_name,
+                final_text, self.model, total_tokens, tool_calls_count, processing_time_ms
+            )
+            usage_log = UsageLog(
+                organization_id=organization_id, job_id=job_id,
+                action="enrichment", credits_consumed=1,
+                tokens_used=total_tokens, model_used=self.model,
+                extra_data={
+                    "company": company_name, "tool_calls": tool_calls_count,
+                    "iterations": iteration, "confidence": result.confidence_score,
+                    "cached_tokens": cached_tokens,
+                    "processing_ms": processing_time_ms, "status": result.status
+                }
+            )
+            db.add(usage_log)
+            # Bulk callers pass commit=False and issue one COMMIT after the
+            # whole batch, so N companies cost ~1 transaction instead of N
+            # fsyncs.
+            if commit:
+                await db.commit()
+            return result
+
+        # Concurrent batch calls share one AsyncSession, which supports only
+        # one operation at a time — the batch passes save_lock so add/flush
+        # never interleave across coroutines.
+        if save_lock is not None:
+            async with save_lock:
+                result = await _persist()
+        else:
+            result = await _persist()
 
         logger.info(f"✓ {company_name} | conf={result.confidence_score}/10 | tokens={total_tokens:,} | {processing_time_ms}ms")
         return result
 
-    def _call_groq_with_retry(self, messages: list):
-        import time as _time
+    async def enrich_companies_batch(
+        self,
+        db: AsyncSession,
+        job_id: Optional[UUID],
+        organization_id: UUID,
+        companies: list,
+        website_hints: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> list:
+        """Enrich many companies concurrently for latency-tolerant bulk jobs.
+
+        Groq has no batch-submission API (unlike Anthropic's Batches
+        endpoint), so this fans out individual enrich_company calls under a
+        semaphore instead — throughput scales with `concurrency` while the
+        cap keeps us inside per-minute rate limits. Failures are returned
+        in-place as exceptions rather than aborting the batch.
+        """
+        website_hints = website_hints or {}
+        sem = asyncio.Semaphore(concurrency)
+        # The Groq/tool work runs concurrently; only the session writes are
+        # serialized — AsyncSession forbids concurrent operations.
+        save_lock = asyncio.Lock()
+
+        async def _one(company: str):
+            async with sem:
+                return await self.enrich_company(
+                    db=db, job_id=job_id, organization_id=organization_id,
+                    company_name=company, website_hint=website_hints.get(company),
+                    commit=False, save_lock=save_lock,
+                )
+
+        results = await asyncio.gather(*[_one(c) for c in companies], return_exceptions=True)
+        # One COMMIT for the whole batch — flushed rows go out together via
+        # SQLAlchemy's insertmanyvalues batching.
+        await db.commit()
+        return results
+
+    def _retry_wait(self, attempt: int, error=None) -> float:
+        """Jittered exponential backoff ("full jitter"), capped at 60s.
+
+        Without jitter, parallel enrichments that 429 together retry in
+        lockstep and re-trigger the same burst. A server-supplied
+        retry_after always wins as the floor.
+        """
+        wait = random.uniform(self.base_delay, self.base_delay * (2 ** attempt))
+        wait = max(wait, getattr(error, "retry_after", 0) or 0)
+        return min(wait, 60.0)
+
+    async def _call_groq_with_retry(self, messages: list):
         for attempt in range(self.max_retries):
             try:
-                return self.client.chat.completions.create(
+                return await self.client.chat.completions.create(
                     model=self.model, messages=messages,
                     tools=GROQ_TOOL_DEFINITIONS, tool_choice="auto",
                     max_tokens=settings.GROQ_MAX_TOKENS, temperature=0.1,
@@ -203,20 +306,20 @@ class EnrichmentAgent:
                 )
             except APITimeoutError as e:
                 # §2: Timeout error handling
-                wait = self.base_delay * (2 ** attempt)
+                wait = self._retry_wait(attempt, e)
                 logger.warning(
                     "  Groq API timeout (attempt %d/%d) — waiting %.0fs. "
                     "Fix: increase GROQ_MAX_TOKENS or check network. Error: %s",
                     attempt + 1, self.max_retries, wait, e,
                 )
-                _time.sleep(wait)
+                await asyncio.sleep(wait)
             except RateLimitError as e:
-                wait = self.base_delay * (2 ** attempt)
+                wait = self._retry_wait(attempt, e)
                 logger.warning(f"  Rate limited, waiting {wait:.0f}s — {e}")
-                _time.sleep(wait)
+                await asyncio.sleep(wait)
             except APIError as e:
                 if attempt < self.max_retries - 1:
-                    _time.sleep(self.base_delay)
+                    await asyncio.sleep(self._retry_wait(attempt, e))
                 else:
                     logger.error(f"  Groq APIError: {e}")
                     return None
@@ -233,7 +336,7 @@ class EnrichmentAgent:
         try:
             json_str = self._extract_json(raw_text)
             if json_str:
-                data = json.loads(json_str)
+                data = orjson.loads(json_str)
                 if not isinstance(data, dict):
                     raise ValueError("Not a dict")
             else:
@@ -243,20 +346,26 @@ class EnrichmentAgent:
             status = "failed"
             error_message = str(e)
 
+        # Bind the bound method once and convert the two int fields up front —
+        # one pass over the dict instead of interleaved lookups per kwarg.
+        get = data.get
+        founded_year = self._safe_int(get("founded_year"))
+        confidence_score = self._safe_int(get("confidence_score"))
+
         result = EnrichmentResult(
             job_id=job_id, organization_id=organization_id, input_name=company_name,
-            company_name=data.get("name") or company_name,
-            website=data.get("website"), linkedin_url=data.get("linkedin_url"),
-            founded_year=self._safe_int(data.get("founded_year")),
-            headquarters=data.get("headquarters"), employee_count=data.get("employee_count"),
-            industry=data.get("industry"), company_type=data.get("company_type"),
-            description=data.get("description"), key_products=data.get("key_products") or [],
-            target_customers=data.get("target_customers"), tech_stack=data.get("tech_stack") or [],
-            recent_news=data.get("recent_news"), funding_info=data.get("funding_info"),
-            key_contacts=data.get("key_contacts") or [],
+            company_name=get("name") or company_name,
+            website=get("website"), linkedin_url=get("linkedin_url"),
+            founded_year=founded_year,
+            headquarters=get("headquarters"), employee_count=get("employee_count"),
+            industry=get("industry"), company_type=get("company_type"),
+            description=get("description"), key_products=get("key_products") or [],
+            target_customers=get("target_customers"), tech_stack=get("tech_stack") or [],
+            recent_news=get("recent_news"), funding_info=get("funding_info"),
+            key_contacts=get("key_contacts") or [],
             # raw_data column removed — was storing full Groq response per row (too large at scale)
-            confidence_score=self._safe_int(data.get("confidence_score")),
-            enrichment_notes=data.get("enrichment_notes"),
+            confidence_score=confidence_score,
+            enrichment_notes=get("enrichment_notes"),
             status=status, error_message=error_message,
             model_used=model_used, tokens_used=tokens_used,
             tool_calls_made=tool_calls_made, processing_time_ms=processing_time_ms,
@@ -266,44 +375,49 @@ class EnrichmentAgent:
         await db.flush()
         return result
 
+    _JSON_DECODER = json.JSONDecoder()
+
     def _extract_json(self, text: str) -> Optional[str]:
+        """Find the first JSON object in LLM output with one linear scan.
+
+        raw_decode parses in C from a given offset, replacing the old
+        four-pass regex/loads approach (and its backtracking risk on
+        adversarial outputs).
+        """
         if not text:
             return None
-        text = text.strip()
-        if text.startswith("{"):
+        # Drop code fences so a ```json block parses from its opening brace.
+        text = text.replace("```json", "").replace("```", "").strip()
+        idx = text.find("{")
+        while idx != -1:
             try:
-                json.loads(text)
-                return text
+                obj, end = self._JSON_DECODER.raw_decode(text, idx)
             except json.JSONDecodeError:
-                pass
-        cb = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
-        if cb:
+                idx = text.find("{", idx + 1)
+                continue
+            if isinstance(obj, dict):
+                return text[idx:end]
+            idx = text.find("{", end)
+        # Truncated output (max_tokens hit): try closing the last open object.
+        idx = text.find("{")
+        if idx != -1:
+            candidate = text[idx:].rstrip().rstrip(",") + "\n}"
             try:
-                json.loads(cb.group(1))
-                return cb.group(1)
-            except json.JSONDecodeError:
-                pass
-        jm = re.search(r"\{.*\}", text, re.DOTALL)
-        if jm:
-            try:
-                json.loads(jm.group(0))
-                return jm.group(0)
-            except json.JSONDecodeError:
-                pass
-        partial = re.search(r"\{.*", text, re.DOTALL)
-        if partial:
-            candidate = partial.group(0).rstrip().rstrip(",") + "\n}"
-            try:
-                json.loads(candidate)
-                return candidate
-            except json.JSONDecodeError:
+                if isinstance(orjson.loads(candidate), dict):
+                    return candidate
+            except orjson.JSONDecodeError:
                 pass
         return None
 
     def _safe_int(self, value) -> Optional[int]:
-        if value is None:
+        # Type-check fast paths: the common None case costs no raised
+        # exception, and a clean int passes straight through.
+        if isinstance(value, bool):
             return None
-        try:
+        if isinstance(value, int):
+            return value
+        if isinstance(value, float):
             return int(value)
-        except (ValueError, TypeError):
-            return None
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            return int(value)
+        return None
@@ -1,10 +1,18 @@
+import asyncio
+import os
 import re
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+from cachetools import TTLCache
+from selectolax.parser import HTMLParser
+
+_WS_RE = re.compile(r'\s+')
 
 
 def clean_text(text: str) -> str:
-    return re.sub(r'\s+', ' ', text).strip()
+    return _WS_RE.sub(' ', text).strip()
 
 
 def get_headers() -> dict:
@@ -15,54 +23,140 @@ def get_headers() -> dict:
     }
 
 
-def search_web(query: str, num_results: int = 5) -> str:
+# One shared async client per event loop: keep-alive skips the TCP+TLS
+# handshake on repeat calls to the same host (DuckDuckGo is hit several
+# times per enrichment), and the transport retries transient connect
+# failures. Keyed by loop rather than module-global because the Celery
+# worker runs every task on a fresh loop — connections pooled on job N's
+# loop would raise "Event loop is closed" from job N+1.
+_clients: dict = {}
+
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        # Drop entries for loops that have since been closed so dead
+        # clients don't accumulate across worker tasks.
+        for stale in [l for l in _clients if l.is_closed()]:
+            del _clients[stale]
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=15.0,
+            headers=get_headers(),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            transport=httpx.AsyncHTTPTransport(retries=3),
+        )
+    return client
+
+
+# "brave" needs BRAVE_SEARCH_API_KEY (free tier at brave.com/search/api).
+# DuckDuckGo's Instant Answer API stays as the keyless fallback, but it only
+# answers ~5% of queries — real SERP results save the agent whole iterations.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "brave" if os.getenv("BRAVE_SEARCH_API_KEY") else "duckduckgo")
+
+
+async def _search_brave(query: str, num_results: int) -> str:
+    r = await _get_client().get(
+        "https://api.search.brave.com/res/v1/web/search",
+        params={"q": query, "count": num_results},
+        headers={"X-Subscription-Token": os.getenv("BRAVE_SEARCH_API_KEY", ""), "Accept": "application/json"},
+        timeout=10,
+    )
+    r.raise_for_status()
+    results = []
+    for item in r.json().get("web", {}).get("results", [])[:num_results]:
+        results.append(f"- {item.get('title', '')}: {item.get('description', '')}")
+        if item.get("url"):
+            results.append(f"  URL: {item['url']}")
+    return "\n".join(results) if results else f"No results for: {query}"
+
+
+async def _search_duckduckgo(query: str, num_results: int) -> str:
+    url = "https://api.duckduckgo.com/"
+    params = {"q": query, "format": "json", "no_html": "1", "skip_disambig": "1"}
+    r = await _get_client().get(url, params=params, timeout=10)
+    data = r.json()
+    results = []
+    if data.get("AbstractText"):
+        results.append(f"Summary: {data['AbstractText']}")
+        if data.get("AbstractURL"):
+            results.append(f"Source: {data['AbstractURL']}")
+    for topic in data.get("RelatedTopics", [])[:num_results]:
+        if isinstance(topic, dict) and topic.get("Text"):
+            results.append(f"- {topic['Text']}")
+            if topic.get("FirstURL"):
+                results.append(f"  URL: {topic['FirstURL']}")
+    return "\n".join(results) if results else f"No results for: {query}"
+
+
+async def search_web(query: str, num_results: int = 5) -> str:
     try:
-        url = "https://api.duckduckgo.com/"
-        params = {"q": query, "format": "json", "no_html": "1", "skip_disambig": "1"}
-        r = requests.get(url, params=params, timeout=10, headers=get_headers())
-        data = r.json()
-        results = []
-        if data.get("AbstractText"):
-            results.append(f"Summary: {data['AbstractText']}")
-            if data.get("AbstractURL"):
-                results.append(f"Source: {data['AbstractURL']}")
-        for topic in data.get("RelatedTopics", [])[:num_results]:
-            if isinstance(topic, dict) and topic.get("Text"):
-                results.append(f"- {topic['Text']}")
-                if topic.get("FirstURL"):
-                    results.append(f"  URL: {topic['FirstURL']}")
-        return "\n".join(results) if results else f"No results for: {query}"
+        if SEARCH_BACKEND == "brave":
+            return await _search_brave(query, num_results)
+        return await _search_duckduckgo(query, num_results)
     except Exception as e:
         return f"Search error: {str(e)}"
 
 
-def scrape_website(url: str, max_chars: int = 6000) -> str:
+# Small dedicated pool for HTML parsing: keeps a burst of big pages from
+# occupying asyncio's shared default executor (used elsewhere for I/O).
+_PARSE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="html-parse")
+
+
+def _extract_page_text(html: str, max_chars: int) -> str:
+    """CPU-bound HTML parse — runs in a worker thread, off the event loop.
+
+    selectolax (C-backed Modest engine) parses a typical homepage an order
+    of magnitude faster than BeautifulSoup's html.parser backend.
+    """
+    tree = HTMLParser(html)
+    tree.strip_tags(["script", "style", "nav", "footer", "header", "iframe", "noscript"])
+    sections = []
+    for sel in ["main", "article", "[class*='about']", "[class*='company']", "[class*='hero']"]:
+        s = tree.css_first(sel)
+        if s:
+            t = clean_text(s.text(separator=" "))
+            if len(t) > 100:
+                sections.append(t)
+    body = tree.body
+    text = " ".join(sections) or clean_text(body.text(separator=" ") if body else tree.text(separator=" "))
+    return (text[:max_chars] + "...[truncated]") if len(text) > max_chars else text
+
+
+# Only ever keep max_chars (~6KB) of page text, so never buffer more than
+# this much raw HTML — protects against 10MB pages or binaries mislabelled
+# as text.
+_MAX_DOWNLOAD_BYTES = 512 * 1024
+
+
+async def scrape_website(url: str, max_chars: int = 6000) -> str:
     if not url.startswith(("http://", "https://")):
         url = "https://" + url
     try:
-        r = requests.get(url, timeout=15, headers=get_headers(), allow_redirects=True)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer", "header", "iframe", "noscript"]):
-            tag.decompose()
-        sections = []
-        for sel in ["main", "article", "[class*='about']", "[class*='company']", "[class*='hero']"]:
-            s = soup.select_one(sel)
-            if s:
-                t = clean_text(s.get_text())
-                if len(t) > 100:
-                    sections.append(t)
-        text = " ".join(sections) or clean_text(soup.get_text())
-        return (text[:max_chars] + "...[truncated]") if len(text) > max_chars else text
+        async with _get_client().stream("GET", url) as r:
+            r.raise_for_status()
+            ctype = r.headers.get("Content-Type", "")
+            if not ctype.startswith(("text/html", "application/xhtml")):
+                return f"Skipped {url}: not an HTML page (Content-Type: {ctype or 'unknown'})"
+            buf = bytearray()
+            async for chunk in r.aiter_bytes(65536):
+                buf.extend(chunk)
+                if len(buf) >= _MAX_DOWNLOAD_BYTES:
+                    break
+            html = bytes(buf).decode(r.encoding or "utf-8", errors="replace")
+        return await asyncio.get_running_loop().run_in_executor(
+            _PARSE_POOL, _extract_page_text, html, max_chars
+        )
     except Exception as e:
         return f"Scrape error for {url}: {str(e)}"
 
 
-def find_company_website(company_name: str) -> str:
+async def find_company_website(company_name: str) -> str:
     try:
         url = "https://api.duckduckgo.com/"
         params = {"q": f"{company_name} official website", "format": "json", "no_html": "1"}
-        r = requests.get(url, params=params, timeout=10, headers=get_headers())
+        r = await _get_client().get(url, params=params, timeout=10)
         data = r.json()
         if data.get("AbstractURL"):
             return data["AbstractURL"]
@@ -74,8 +168,8 @@ def find_company_website(company_name: str) -> str:
         return f"Error: {str(e)}"
 
 
-def get_linkedin_info(company_name: str) -> str:
-    return search_web(f"site:linkedin.com/company {company_name}", 3)
+async def get_linkedin_info(company_name: str) -> str:
+    return await search_web(f"site:linkedin.com/company {company_name}", 3)
 
 
 GROQ_TOOL_DEFINITIONS = [
@@ -140,7 +234,44 @@ GROQ_TOOL_DEFINITIONS = [
 ]
 
 
-def execute_tool(tool_name: str, tool_input: dict) -> str:
+# Re-enriching the same company repeats the exact same DuckDuckGo queries and
+# homepage scrapes, so cache tool output in-process: pages change rarely (24h
+# TTL), search results a bit faster (6h TTL).
+_SCRAPE_CACHE = TTLCache(maxsize=10_000, ttl=86400)
+_SEARCH_CACHE = TTLCache(maxsize=10_000, ttl=21600)
+
+
+def normalize_url(url: str) -> str:
+    """Canonicalize a URL for cache keying: lowercase host, strip trailing
+    slash and utm_* tracking params so cosmetic variants share one entry."""
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    scheme, netloc, path, query, _ = urlsplit(url)
+    query = urlencode([(k, v) for k, v in parse_qsl(query) if not k.startswith("utm_")])
+    return urlunsplit((scheme, netloc.lower(), path.rstrip("/"), query, ""))
+
+
+def _cache_key(tool_name: str, tool_input: dict):
+    """Return (cache, key) for a cacheable call, or (None, None)."""
+    try:
+        if tool_name == "scrape_website":
+            return _SCRAPE_CACHE, (normalize_url(tool_input["url"]), tool_input.get("max_chars", 6000))
+        if tool_name == "search_web":
+            return _SEARCH_CACHE, (tool_name, tool_input["query"].lower().strip(), tool_input.get("num_results", 5))
+        if tool_name in ("find_company_website", "get_linkedin_info"):
+            return _SEARCH_CACHE, (tool_name, tool_input["company_name"].lower().strip())
+    except (KeyError, AttributeError):
+        pass
+    return None, None
+
+
+# Identical calls issued while one is already on the wire (the agent gathers
+# a whole tool_calls batch at once) await the running task instead of hitting
+# the network twice.
+_INFLIGHT: dict = {}
+
+
+async def execute_tool(tool_name: str, tool_input: dict) -> str:
     tool_map = {
         "search_web":           lambda i: search_web(i["query"], i.get("num_results", 5)),
         "scrape_website":       lambda i: scrape_website(i["url"], i.get("max_chars", 6000)),
@@ -150,7 +281,28 @@ def execute_tool(tool_name: str, tool_input: dict) -> str:
     handler = tool_map.get(tool_name)
     if not handler:
         return f"Unknown tool: {tool_name}"
+
+    async def _run() -> str:
+        try:
+            result = await handler(tool_input)
+        except Exception as e:
+            return f"Tool error ({tool_name}): {str(e)}"
+        # Don't pin error strings in the cache — let the next call retry.
+        if cache is not None and not result.startswith(("Search error", "Scrape error", "Error:", "Tool error")):
+            cache[key] = result
+        return result
+
+    cache, key = _cache_key(tool_name, tool_input)
+    if key is None:
+        return await _run()
+    if key in cache:
+        return cache[key]
+    inflight = _INFLIGHT.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    task = asyncio.ensure_future(_run())
+    _INFLIGHT[key] = task
     try:
-        return handler(tool_input)
-    except Exception as e:
-        return f"Tool error ({tool_name}): {str(e)}"
+        return await task
+    finally:
+        _INFLIGHT.pop(key, None)
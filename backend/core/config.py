@@ -1,3 +1,4 @@
+from dataclasses import make_dataclass
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,6 +33,7 @@ class Settings(BaseSettings):
     # Neon PostgreSQL
     DATABASE_URL: str = ""       # asyncpg  (postgresql+asyncpg://...)
     DATABASE_URL_SYNC: str = ""  # psycopg2 (postgresql://...)   for Alembic
+    DATABASE_READ_URL: str = ""  # optional read replica — reads route here when set
 
     # FIX: Reduced defaults to stay within Neon free-tier connection limits.
     # Neon free = 10 connections max. API (5+2=7) + Worker (2) = 9. Safe.
@@ -45,6 +47,9 @@ class Settings(BaseSettings):
 
     # Redis / Celery
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Upstash/managed Redis free tiers cap concurrent connections — bound the
+    # async pool instead of letting a burst open sockets without limit.
+    REDIS_POOL_SIZE: int = 32
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
 
@@ -89,4 +94,26 @@ def get_settings() -> Settings:
     return Settings()
 
 
-settings = get_settings()
+def _freeze(s: Settings):
+    """
+    Snapshot the validated settings into a frozen slots dataclass.
+
+    Config is read on every request (rate-limit middleware, auth, health),
+    and a slot read is a plain C-level lookup — no pydantic machinery, and
+    groq_api_key_resolved becomes a stored value instead of a property
+    recomputed per access. Built from model_fields so new Settings fields
+    are picked up automatically.
+    """
+    names = list(type(s).model_fields)
+    Frozen = make_dataclass(
+        "FrozenSettings",
+        [(n, object) for n in names] + [("groq_api_key_resolved", str)],
+        frozen=True,
+        slots=True,
+    )
+    values = {n: getattr(s, n) for n in names}
+    values["groq_api_key_resolved"] = s.groq_api_key_resolved
+    return Frozen(**values)
+
+
+settings = _freeze(get_settings())
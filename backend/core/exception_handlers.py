@@ -25,10 +25,13 @@ def register_exception_handlers(app: FastAPI) -> None:
     # ── 422: Pydantic / body validation ──────────────────────────────────────
     @app.exception_handler(RequestValidationError)
     async def validation_error_handler(request: Request, exc: RequestValidationError):
-        logger.warning(
-            "Validation error | %s %s | %s",
-            request.method, request.url.path, exc.errors()
-        )
+        # isEnabledFor guards: %-args are lazy, but exc.errors() and the
+        # URL-path property evaluate eagerly — skip them when the level is off.
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Validation error | %s %s | %s",
+                request.method, request.url.path, exc.errors()
+            )
         return JSONResponse(
             status_code=422,
             content={
@@ -41,13 +44,10 @@ def register_exception_handlers(app: FastAPI) -> None:
     # ── 4xx: HTTP errors — log 500+, pass-through rest ───────────────────────
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-        if exc.status_code >= 500:
-            logger.error(
-                "HTTP %d | %s %s | %s",
-                exc.status_code, request.method, request.url.path, exc.detail
-            )
-        else:
-            logger.info(
+        level = logging.ERROR if exc.status_code >= 500 else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(
+                level,
                 "HTTP %d | %s %s | %s",
                 exc.status_code, request.method, request.url.path, exc.detail
             )
@@ -59,11 +59,12 @@ def register_exception_handlers(app: FastAPI) -> None:
     # ── 500: Unhandled — NEVER leak stack traces to the client ────────────────
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
-        logger.error(
-            "Unhandled exception | %s %s | %s",
-            request.method, request.url.path, exc,
-            exc_info=True,  # includes full traceback in logs
-        )
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error(
+                "Unhandled exception | %s %s | %s",
+                request.method, request.url.path, exc,
+                exc_info=True,  # includes full traceback in logs
+            )
         return JSONResponse(
             status_code=500,
             content={
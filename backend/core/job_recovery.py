@@ -41,6 +41,8 @@ async def stuck_job_cleanup(db) -> dict:
 
     cutoff = datetime.utcnow() - timedelta(hours=STUCK_THRESHOLD_HOURS)
 
+    # No RETURNING: a cleanup that resets thousands of jobs shouldn't ship
+    # every UUID back just to count them — rowcount answers that for free.
     result = await db.execute(
         text("""
             UPDATE jobs
@@ -49,21 +51,33 @@ async def stuck_job_cleanup(db) -> dict:
                 completed_at  = NOW()
             WHERE status IN ('running', 'queued')
               AND (started_at < :cutoff OR (started_at IS NULL AND created_at < :cutoff))
-            RETURNING id
         """),
         {"cutoff": cutoff},
     )
-    reset_ids = result.fetchall()
+    reset_count = result.rowcount
     await db.commit()
 
-    if reset_ids:
+    if reset_count:
         logger.warning(
-            "Stuck job cleanup: reset %d jobs older than %dh: %s",
-            len(reset_ids), STUCK_THRESHOLD_HOURS,
-            [str(r[0]) for r in reset_ids],
+            "Stuck job cleanup: reset %d jobs older than %dh",
+            reset_count, STUCK_THRESHOLD_HOURS,
         )
 
-    return {"reset": len(reset_ids)}
+    # Reconcile the Redis active-job counters (used by create_job's
+    # concurrency cap) against the DB — corrects any drift from lost DECRs
+    # or jobs reset above.
+    from sqlalchemy import select, func
+    from db.models import Job
+    from core.rate_limiter import reconcile_active_jobs
+
+    rows = await db.execute(
+        select(Job.organization_id, func.count(Job.id))
+        .where(Job.status.in_(["queued", "running"]))
+        .group_by(Job.organization_id)
+    )
+    await reconcile_active_jobs({r[0]: r[1] for r in rows})
+
+    return {"reset": reset_count}
 
 
 async def job_health_summary(db) -> dict:
@@ -82,38 +96,37 @@ async def job_health_summary(db) -> dict:
     from sqlalchemy import select, func
     from db.models import Job
 
-    cutoff = datetime.utcnow() - timedelta(hours=STUCK_THRESHOLD_HOURS)
-    since_24h = datetime.utcnow() - timedelta(hours=24)
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=STUCK_THRESHOLD_HOURS)
+    since_24h = now - timedelta(hours=24)
 
+    # One GROUP BY with FILTERed aggregates replaces the old
+    # 1-GROUP-BY-plus-3-COUNTs fan — a single round-trip and pool
+    # acquisition per health probe.
     rows = await db.execute(
-        select(Job.status, func.count(Job.id)).group_by(Job.status)
+        select(
+            Job.status,
+            func.count(Job.id),
+            func.count(Job.id).filter(Job.started_at < cutoff),
+            func.count(Job.id).filter(Job.completed_at >= since_24h),
+        ).group_by(Job.status)
     )
-    by_status = {r[0]: r[1] for r in rows}
 
-    stuck_r = await db.execute(
-        select(func.count(Job.id)).where(
-            Job.status == "running",
-            Job.started_at < cutoff,
-        )
-    )
-
-    failed_r = await db.execute(
-        select(func.count(Job.id)).where(
-            Job.status == "failed",
-            Job.completed_at >= since_24h,
-        )
-    )
-    completed_r = await db.execute(
-        select(func.count(Job.id)).where(
-            Job.status == "completed",
-            Job.completed_at >= since_24h,
-        )
-    )
+    by_status = {}
+    stuck = failed_24h = completed_24h = 0
+    for job_status, total, older_than_cutoff, done_recently in rows:
+        by_status[job_status] = total
+        if job_status == "running":
+            stuck = older_than_cutoff
+        elif job_status == "failed":
+            failed_24h = done_recently
+        elif job_status == "completed":
+            completed_24h = done_recently
 
     return {
         "queued":        by_status.get("queued", 0),
         "running":       by_status.get("running", 0),
-        "stuck":         stuck_r.scalar() or 0,
-        "failed_24h":    failed_r.scalar() or 0,
-        "completed_24h": completed_r.scalar() or 0,
+        "stuck":         stuck,
+        "failed_24h":    failed_24h,
+        "completed_24h": completed_24h,
     }
@@ -28,91 +28,403 @@ Common errors + fixes:
   redis.exceptions.ConnectionError → Redis URL wrong or Redis not running
     Fix: Check REDIS_URL in .env. Test: redis-cli -u $REDIS_URL ping
   Memory leak in dev mode:
-    Fixed: old buckets are pruned in _cleanup_old_buckets()
+    Fixed: epoch rotation drops the old counts dict wholesale each minute
 """
+import sys
 import time
+import zlib
+import random
+import asyncio
 import logging
-from collections import defaultdict
 from typing import Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
 # ── In-memory fallback (single-process dev only) ──────────────────────────────
-_mem_buckets: dict = defaultdict(int)
+# Two rolling epoch dicts instead of per-IP timestamped keys: rotation on
+# minute rollover drops the previous minute wholesale, so there is no
+# per-request scan over every key seen recently. The previous epoch's count
+# is weighted by how much of it still falls inside the trailing 60s — the
+# standard sliding-window approximation, which also fixes the 2x burst a
+# plain fixed bucket allows at the boundary. Runs entirely between awaits
+# on one event loop, so rotation needs no lock.
+_mem_epoch: int = 0
+_mem_counts: dict = {}
+_mem_prev_counts: dict = {}
 
 
-def _cleanup_old_buckets(ip: str) -> None:
-    """Prune buckets older than 2 minutes to prevent unbounded memory growth."""
-    current_min = int(time.time() // 60)
-    stale = [k for k in list(_mem_buckets.keys())
-             if k.startswith(ip) and int(k.split(":")[1]) < current_min - 2]
-    for k in stale:
-        _mem_buckets.pop(k, None)
+def _mem_rate_check(ip: str, limit: int) -> Tuple[bool, int]:
+    global _mem_epoch, _mem_counts, _mem_prev_counts
+    now = time.time()
+    epoch = int(now // 60)
+    if epoch != _mem_epoch:
+        # More than one minute idle means the old counts are all stale.
+        _mem_prev_counts = _mem_counts if epoch == _mem_epoch + 1 else {}
+        _mem_counts = {}
+        _mem_epoch = epoch
+    count = _mem_counts.get(ip, 0) + 1
+    _mem_counts[ip] = count
+    prev_weight = 1.0 - (now % 60) / 60.0
+    estimated = count + _mem_prev_counts.get(ip, 0) * prev_weight
+    if estimated <= limit:
+        return True, 0
+    return False, max(1, int(60 - now % 60) + 1)
 
 
-def _mem_rate_check(ip: str, limit: int) -> Tuple[bool, int]:
-    bucket = f"{ip}:{int(time.time() // 60)}"
-    _mem_buckets[bucket] += 1
-    _cleanup_old_buckets(ip)
-    allowed = _mem_buckets[bucket] <= limit
-    return allowed, 60 if not allowed else 0
+# Optional native accelerator. The pure-Python implementation above is what
+# ships; if a compiled drop-in with the same (ip, limit) -> (allowed,
+# retry_after) contract is installed it is picked up automatically — the
+# same auto-upgrade pattern redis-py uses for hiredis.
+try:
+    from rate_limiter_core import check_local as _mem_rate_check  # type: ignore  # noqa: F811
+except ImportError:
+    pass
 
 
 # ── Redis-backed (multi-worker production) ────────────────────────────────────
 _redis_client = None
-_redis_failed = False  # don't spam logs after first failure
+_redis_failed = False      # don't spam logs between probes
+_redis_retry_at = 0.0      # monotonic deadline for the next connect attempt
+_redis_init_lock = None    # created lazily — module imports before a loop exists
+
+# Sliding-window limiter in one atomic script (EVALSHA after the first
+# call). A sorted set of request timestamps replaces the old fixed counter:
+# fixed buckets let a client burst 2x the limit across a bucket boundary,
+# while the window here always covers exactly the trailing 60 seconds.
+# ARGV: now_ms, window_ms, limit, member. Returns {allowed, retry_after_ms}.
+_RATE_LIMIT_LUA = (
+    "redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1] - ARGV[2]) "
+    "local n = redis.call('ZCARD', KEYS[1]) "
+    "if n < tonumber(ARGV[3]) then "
+    "  redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4]) "
+    "  redis.call('PEXPIRE', KEYS[1], ARGV[2]) "
+    "  return {1, 0, n + 1} "
+    "end "
+    "local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES') "
+    "return {0, ARGV[2] - (ARGV[1] - tonumber(oldest[2])), n}"
+)
+_rate_script = None  # registered lazily against the shared client
 
 
-def _get_redis():
-    global _redis_client, _redis_failed
+async def _get_redis():
+    """
+    Lazily build the shared client, exactly once.
+
+    The old sync version had a first-request stampede — concurrent
+    coroutines each constructed a client and all but one leaked — and it
+    cached the pool before any connection was proven, so a down Redis
+    hung early requests until the socket timeout. Now: double-checked
+    asyncio.Lock, an explicit bounded PING before caching, and a failed
+    probe backs off 30s (instead of giving up forever) while callers use
+    the in-memory fallback.
+    """
+    global _redis_client, _redis_failed, _redis_retry_at, _redis_init_lock
     if _redis_client is not None:
         return _redis_client
-    if _redis_failed:
+    if _redis_failed and time.monotonic() < _redis_retry_at:
         return None
-    try:
-        import redis.asyncio as aioredis
-        from core.config import settings
-        if not settings.REDIS_URL:
-            return None
-        _redis_client = aioredis.from_url(
-            settings.REDIS_URL,
-            socket_connect_timeout=2,
-            socket_timeout=1,
-            decode_responses=True,
-        )
-        logger.info("Rate limiter: Redis backend initialized")
-        return _redis_client
-    except Exception as e:
-        _redis_failed = True
-        logger.warning("Rate limiter: Redis unavailable (%s) — falling back to in-memory", e)
+
+    from core.config import settings
+    if not settings.REDIS_URL:
         return None
 
+    if _redis_init_lock is None:
+        _redis_init_lock = asyncio.Lock()
+    async with _redis_init_lock:
+        if _redis_client is not None:
+            return _redis_client
+        if _redis_failed and time.monotonic() < _redis_retry_at:
+            return None
+        try:
+            import redis.asyncio as aioredis
+            # BlockingConnectionPool: a traffic burst queues for a free
+            # connection (up to 5s) instead of opening unbounded sockets —
+            # managed Redis tiers cap concurrent connections hard.
+            pool = aioredis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_POOL_SIZE,
+                timeout=5,
+                socket_connect_timeout=2,
+                socket_timeout=1,
+                socket_keepalive=True,
+                health_check_interval=30,
+                decode_responses=True,
+            )
+            client = aioredis.Redis(connection_pool=pool)
+            await asyncio.wait_for(client.ping(), 2.0)
+            _redis_client = client
+            _redis_failed = False
+            logger.info("Rate limiter: Redis backend initialized")
+            return _redis_client
+        except Exception as e:
+            _redis_failed = True
+            _redis_retry_at = time.monotonic() + 30.0
+            logger.warning(
+                "Rate limiter: Redis unavailable (%s) — in-memory fallback, retry in 30s", e
+            )
+            return None
+
+
+# IP → Redis key, memoized. The key is "rl:" + CRC32(ip) in hex — 11 bytes
+# regardless of address family, vs up to ~48 for a raw IPv6 key, which cuts
+# wire bytes and Redis-side key hashing. A CRC collision merely makes two
+# IPs share a window (over-enforcement, never under-), which is acceptable
+# for abuse limiting. Kept as ASCII because the client is shared with the
+# job-slot counters, which rely on decode_responses=True.
+_rate_keys: dict = {}
+
+
+def _rate_key(ip: str) -> str:
+    key = _rate_keys.get(ip)
+    if key is None:
+        if len(_rate_keys) > _L1_MAX_IPS:
+            _rate_keys.clear()
+        key = _rate_keys[ip] = "rl:%08x" % zlib.crc32(ip.encode())
+    return key
+
+
+def _script_args(ip: str, limit: int, now_ms: int):
+    # Random suffix keeps members unique if two requests land in the
+    # same millisecond.
+    member = f"{now_ms}-{random.getrandbits(32):08x}"
+    return [_rate_key(ip)], [now_ms, 60_000, limit, member]
+
+
+def _finish_rate_result(ip: str, limit: int, result) -> Tuple[bool, int]:
+    allowed, retry_ms, count = result
+    if allowed:
+        if count < limit * _L1_WATERMARK:
+            _grant_l1_credits(ip, limit)
+        return True, 0
+    # Exact wait until the oldest request ages out of the window.
+    return False, max(1, int(retry_ms) // 1000 + 1)
+
 
 async def _redis_rate_check(ip: str, limit: int) -> Tuple[bool, int]:
-    redis = _get_redis()
+    global _rate_script
+    redis = await _get_redis()
     if redis is None:
         return _mem_rate_check(ip, limit)
     try:
-        key = f"rl:{ip}:{int(time.time() // 60)}"
-        pipe = redis.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, 120)
-        results = await pipe.execute()
-        count = results[0]
-        allowed = count <= limit
-        return allowed, 60 if not allowed else 0
+        if _rate_script is None:
+            _rate_script = redis.register_script(_RATE_LIMIT_LUA)
+        keys, args = _script_args(ip, limit, int(time.time() * 1000))
+        result = await _rate_script(keys=keys, args=args)
+        return _finish_rate_result(ip, limit, result)
     except Exception as e:
         logger.warning("Redis rate check failed (%s) — falling back to in-memory", e)
         return _mem_rate_check(ip, limit)
 
 
+# ── Coalescing batcher ────────────────────────────────────────────────────────
+# Concurrent requests that miss the L1 credits each cost a Redis round-trip.
+# When the batcher is running (started from the app lifespan), checks that
+# land in the same ~1ms window share one pipeline: one TCP round-trip for N
+# EVALSHAs instead of N. Without the batcher (worker process, tests) checks
+# go direct.
+
+_rl_queue = None  # created by start_rate_limit_batcher on the serving loop
+
+
+async def _rate_batcher():
+    global _rate_script
+    while True:
+        batch = [await _rl_queue.get()]
+        # Let the rest of the burst land before flushing.
+        await asyncio.sleep(0.001)
+        while True:
+            try:
+                batch.append(_rl_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            redis = await _get_redis()
+            if redis is None:
+                raise ConnectionError("Redis unavailable")
+            if _rate_script is None:
+                _rate_script = redis.register_script(_RATE_LIMIT_LUA)
+            now_ms = int(time.time() * 1000)
+            pipe = redis.pipeline(transaction=False)
+            for ip, limit, _fut in batch:
+                keys, args = _script_args(ip, limit, now_ms)
+                await _rate_script(keys=keys, args=args, client=pipe)
+            results = await pipe.execute()
+            for (ip, limit, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(_finish_rate_result(ip, limit, result))
+        except asyncio.CancelledError:
+            for _ip, _limit, fut in batch:
+                if not fut.done():
+                    fut.cancel()
+            raise
+        except Exception as e:
+            logger.warning("Batched rate check failed (%s) — falling back to in-memory", e)
+            for ip, limit, fut in batch:
+                if not fut.done():
+                    fut.set_result(_mem_rate_check(ip, limit))
+
+
+def start_rate_limit_batcher() -> "asyncio.Task":
+    """Start the coalescing batcher on the current loop (call from lifespan)."""
+    global _rl_queue
+    _rl_queue = asyncio.Queue()
+    return asyncio.create_task(_rate_batcher())
+
+
+# ── L1 fast path ──────────────────────────────────────────────────────────────
+# Every request otherwise pays a Redis round-trip even when the client is
+# nowhere near its limit — the overwhelmingly common case. When an
+# authoritative check shows an IP under half its limit, it is prepaid a
+# small, short-lived batch of local credits consumed with zero Redis calls.
+# Locally-admitted requests aren't recorded in the sorted set, so Redis can
+# undercount by at most the grant size per worker — bounded slack that only
+# exists while usage is far below the limit; near the limit every request
+# goes back to being checked authoritatively.
+
+_L1_WATERMARK = 0.5
+_L1_TTL = 2.0           # seconds a credit grant stays valid
+_L1_MAX_IPS = 10_000    # lazy prune threshold
+_l1_credits: dict = {}  # ip -> [credits_remaining, expires_at_monotonic]
+
+
+def _grant_l1_credits(ip: str, limit: int) -> None:
+    credits = max(1, limit // 20)
+    if len(_l1_credits) > _L1_MAX_IPS:
+        now = time.monotonic()
+        for k in [k for k, v in _l1_credits.items() if v[1] <= now]:
+            _l1_credits.pop(k, None)
+    _l1_credits[ip] = [credits, time.monotonic() + _L1_TTL]
+
+
 async def check_rate_limit(ip: str, limit: int) -> Tuple[bool, int]:
     """
     Check if this IP is within the rate limit.
     Returns (allowed: bool, retry_after_seconds: int).
 
     Debug:
-      # Manually check Redis bucket:
-      redis-cli get "rl:127.0.0.1:<current_minute>"
+      # Manually inspect an IP's request window (keys are rl:<crc32-hex>):
+      python -c 'import zlib; print("rl:%08x" % zlib.crc32(b"127.0.0.1"))'
+      redis-cli -u $REDIS_URL zrange <key> 0 -1 WITHSCORES
     """
+    # A server sees the same handful of client IPs over and over; interning
+    # makes every dict lookup below (credits, in-memory counters) a pointer
+    # compare instead of a string hash + char-by-char equality check.
+    ip = sys.intern(ip)
+    entry = _l1_credits.get(ip)
+    if entry is not None and entry[0] > 0 and entry[1] > time.monotonic():
+        entry[0] -= 1
+        return True, 0
+    if _rl_queue is not None:
+        fut = asyncio.get_running_loop().create_future()
+        await _rl_queue.put((ip, limit, fut))
+        return await fut
     return await _redis_rate_check(ip, limit)
+
+
+# ── Active-job slot counter (per-org concurrency cap) ─────────────────────────
+# create_job used COUNT(*) over the jobs table on every call to enforce
+# MAX_CONCURRENT_JOBS_PER_ORG — a race under burst submissions and an extra
+# query per request. The counter lives in Redis instead: INCR-then-compare is
+# atomic, so two simultaneous submissions can't both sneak under the cap.
+# stuck_job_cleanup() (run periodically from the API lifespan) reconciles
+# the counters against the DB, and the TTL bounds any drift if a DECR is
+# ever lost.
+
+_ACTIVE_JOBS_TTL = 6 * 3600
+
+# DECR with a floor at zero — a double release must not go negative and
+# permanently free phantom slots.
+_DECR_FLOOR_LUA = (
+    "local v = tonumber(redis.call('GET', KEYS[1]) or '0') "
+    "if v > 0 then return redis.call('DECR', KEYS[1]) end return 0"
+)
+
+# Claim a slot if under the cap. The TTL is only refreshed on a successful
+# claim: a rejected attempt must not keep phantom slots (from a lost DECR)
+# alive forever just because the org keeps retrying.
+_RESERVE_SLOT_LUA = (
+    "local n = redis.call('INCR', KEYS[1]) "
+    "if n > tonumber(ARGV[1]) then "
+    "  redis.call('DECR', KEYS[1]) "
+    "  return 0 "
+    "end "
+    "redis.call('EXPIRE', KEYS[1], ARGV[2]) "
+    "return 1"
+)
+
+
+def _active_jobs_key(org_id) -> str:
+    return f"org:{org_id}:active_jobs"
+
+
+async def reserve_job_slot(org_id, limit: int) -> Optional[bool]:
+    """
+    Atomically claim an active-job slot for this org.
+
+    Returns True if claimed, False if the org is at its cap, or None if
+    Redis is unavailable — the caller should fall back to the COUNT(*) check.
+    """
+    redis = await _get_redis()
+    if redis is None:
+        return None
+    try:
+        claimed = await redis.eval(
+            _RESERVE_SLOT_LUA, 1, _active_jobs_key(org_id),
+            limit, _ACTIVE_JOBS_TTL,
+        )
+        return bool(claimed)
+    except Exception as e:
+        logger.warning("Job slot reserve failed (%s) — falling back to DB count", e)
+        return None
+
+
+async def release_job_slot(org_id) -> None:
+    """Release a slot claimed by reserve_job_slot. Safe to call twice."""
+    redis = await _get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.eval(_DECR_FLOOR_LUA, 1, _active_jobs_key(org_id))
+    except Exception as e:
+        logger.warning("Job slot release failed (%s) — reconciliation will correct it", e)
+
+
+def release_job_slot_sync(org_id) -> None:
+    """
+    Sync variant for the Celery worker, which runs each task on a fresh
+    event loop — the shared async client's connections would be bound to a
+    dead loop there.
+    """
+    try:
+        import redis as redis_sync
+        from core.config import settings
+        if not settings.REDIS_URL:
+            return
+        with redis_sync.from_url(settings.REDIS_URL, socket_connect_timeout=2,
+                                 socket_timeout=1) as r:
+            r.eval(_DECR_FLOOR_LUA, 1, _active_jobs_key(org_id))
+    except Exception as e:
+        logger.warning("Job slot release failed (%s) — reconciliation will correct it", e)
+
+
+async def reconcile_active_jobs(counts: dict) -> None:
+    """
+    Overwrite the per-org counters with fresh DB counts ({org_id: n}).
+    Called from stuck_job_cleanup to correct any drift from lost DECRs.
+    """
+    redis = await _get_redis()
+    if redis is None:
+        return
+    try:
+        counts = {str(k): v for k, v in counts.items()}
+        async for key in redis.scan_iter(match="org:*:active_jobs"):
+            n = counts.pop(key.split(":")[1], 0)
+            if n > 0:
+                await redis.set(key, n, ex=_ACTIVE_JOBS_TTL)
+            else:
+                await redis.delete(key)
+        for org_id, n in counts.items():
+            if n > 0:
+                await redis.set(_active_jobs_key(org_id), n, ex=_ACTIVE_JOBS_TTL)
+    except Exception as e:
+        logger.warning("Active-job counter reconciliation failed: %s", e)
@@ -33,8 +33,13 @@ def validate_config():
     errors = []
     warnings = []
 
+    # Read each setting once up front — the checks below reuse the locals.
+    db_url = settings.DATABASE_URL
+    secret_key = settings.SECRET_KEY or ""
+    environment = settings.ENVIRONMENT
+
     # ── FATAL: Database ───────────────────────────────────────────────────────
-    if not settings.DATABASE_URL:
+    if not db_url:
         errors.append(
             "DATABASE_URL not set.\n"
             "  Get from: https://neon.tech → New Project → Connection Details\n"
@@ -50,14 +55,14 @@ def validate_config():
         )
 
     # ── FATAL: JWT Secret ─────────────────────────────────────────────────────
-    if not settings.SECRET_KEY:
+    if not secret_key:
         errors.append(
             "SECRET_KEY not set — JWTs will be insecure.\n"
             "  Generate: python3 -c \"import secrets; print(secrets.token_hex(32))\""
         )
-    elif len(settings.SECRET_KEY) < 32:
+    elif len(secret_key) < 32:
         errors.append(
-            f"SECRET_KEY too short ({len(settings.SECRET_KEY)} chars — need ≥ 32).\n"
+            f"SECRET_KEY too short ({len(secret_key)} chars — need ≥ 32).\n"
             "  Generate: python3 -c \"import secrets; print(secrets.token_hex(32))\""
         )
 
@@ -71,13 +76,13 @@ def validate_config():
     if not settings.SENTRY_DSN:
         warnings.append("SENTRY_DSN not set — error tracking disabled (optional).")
 
-    if settings.ENVIRONMENT == "production":
+    if environment == "production":
         if "localhost" in (settings.CELERY_BROKER_URL or ""):
             warnings.append(
                 "CELERY_BROKER_URL points to localhost in production.\n"
                 "  Fix: Set REDIS_URL / CELERY_BROKER_URL to your hosted Redis URL (e.g. Upstash)"
             )
-        if "localhost" in settings.DATABASE_URL:
+        if "localhost" in db_url:
             warnings.append("DATABASE_URL points to localhost in production — use Neon/Supabase URL")
 
     # ── Output ────────────────────────────────────────────────────────────────
@@ -90,4 +95,4 @@ def validate_config():
         msg += "\n\nRestart after fixing: uvicorn api.main:app --reload\n"
         raise RuntimeError(msg)
 
-    logger.info("✓  Config validated (env=%s, warnings=%d)", settings.ENVIRONMENT, len(warnings))
+    logger.info("✓  Config validated (env=%s, warnings=%d)", environment, len(warnings))
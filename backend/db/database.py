@@ -4,7 +4,10 @@ if _BACKEND_ROOT not in sys.path:
     sys.path.insert(0, _BACKEND_ROOT)
 
 
+import time
+import asyncio
 import logging
+import functools
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from db.base import Base
@@ -28,37 +31,133 @@ logger = logging.getLogger(__name__)
 
 import ssl
 
+# Full verification: Neon serves a publicly-trusted cert, so the default
+# context works as-is — CERT_NONE was never needed and silently allowed MITM.
+# Clearing OP_NO_TICKET enables session tickets, so connections opened on
+# pool recycle resume the TLS session (1 RTT) instead of a full handshake.
 _ssl_context = ssl.create_default_context()
-_ssl_context.check_hostname = False
-_ssl_context.verify_mode = ssl.CERT_NONE
+_ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+_ssl_context.options &= ~ssl.OP_NO_TICKET
+
+# jit=off: PostgreSQL JIT costs 10-30 ms warming up a cold plan — a net
+# loss for short OLTP queries, which is all this API runs.
+# prepared_statement_cache_size: the asyncpg dialect re-prepares hot ORM
+# statements otherwise; within a pooled connection's lifetime the cache
+# skips the PARSE round-trip. (If a transaction-pooling proxy is ever put
+# in front of Neon, drop this to 0 — prepared statements don't survive
+# backend switching.)
+_SERVER_SETTINGS = {"application_name": "agentiq-api", "jit": "off"}
 
 _CONNECT_ARGS = {
-    "server_settings": {"application_name": "agentiq-api"},
+    "server_settings": _SERVER_SETTINGS,
     "command_timeout": 30,
     "ssl": _ssl_context,
+    "prepared_statement_cache_size": 512,
 }
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=(settings.ENVIRONMENT == "development"),
+# Coerce a plain postgres URL onto the asyncpg driver — a psycopg2-style
+# DATABASE_URL from the host environment would otherwise fail (or worse,
+# silently pick a sync driver under older configs).
+def _coerce_asyncpg(url: str) -> str:
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# ── Lazy engine construction ──────────────────────────────────────────────────
+# Engines and sessionmakers are built on first use instead of at import
+# time. Importing this module stays cheap (pre-fork import under Gunicorn
+# --preload no longer pays engine setup per worker), and a forked child
+# that never inherited a parent-created pool builds its own — sidestepping
+# the classic fork-before-connect shared-socket bug.
+# `engine` / `AsyncSessionLocal` etc. remain importable as module
+# attributes via __getattr__ below.
+
+@functools.cache
+def get_engine():
+    return create_async_engine(
+        _coerce_asyncpg(settings.DATABASE_URL),
+        # echo logs every statement through Python logging — far too expensive
+        # even in development now that hot endpoints are single-round-trip.
+        echo=False,
+
+        # FIX: Reduced pool size to stay within Neon free-tier connection limits
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+
+        pool_pre_ping=True,             # Re-validate connection before use
+        pool_recycle=settings.DB_POOL_RECYCLE,   # Force-recycle before Neon proxy kills it
+        pool_timeout=10,                # FIX: Don't wait more than 10s for a free connection
+        connect_args=_CONNECT_ARGS,
+    )
+
+
+@functools.cache
+def get_sessionmaker():
+    return async_sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
-    # FIX: Reduced pool size to stay within Neon free-tier connection limits
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
+# ── Optional read replica ─────────────────────────────────────────────────────
+# When DATABASE_READ_URL is set (e.g. a Neon read replica), pure-read
+# endpoints get their own pool so readers never contend with writers for
+# connections. Without it, reads share the writer engine — no extra pool,
+# which matters on the free tier's 10-connection cap.
 
-    pool_pre_ping=True,             # Re-validate connection before use
-    pool_recycle=settings.DB_POOL_RECYCLE,   # Force-recycle before Neon proxy kills it
-    pool_timeout=10,                # FIX: Don't wait more than 10s for a free connection
-    connect_args=_CONNECT_ARGS,
-)
+@functools.cache
+def get_read_engine():
+    if not settings.DATABASE_READ_URL:
+        return get_engine()
+    return create_async_engine(
+        _coerce_asyncpg(settings.DATABASE_READ_URL),
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=10,
+        connect_args={**_CONNECT_ARGS,
+                      "server_settings": {**_SERVER_SETTINGS,
+                                          "application_name": "agentiq-api-read"}},
+    )
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+@functools.cache
+def get_read_sessionmaker():
+    if not settings.DATABASE_READ_URL:
+        return get_sessionmaker()
+    return async_sessionmaker(
+        get_read_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+_LAZY_ATTRS = {
+    "engine": get_engine,
+    "read_engine": get_read_engine,
+    "AsyncSessionLocal": get_sessionmaker,
+    "AsyncReadSessionLocal": get_read_sessionmaker,
+}
+
+
+def __getattr__(name):
+    # Backwards-compatible module attributes (PEP 562) — resolving one
+    # builds the underlying engine, so import them late where laziness
+    # matters.
+    try:
+        return _LAZY_ATTRS[name]()
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -68,7 +167,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     FIX: Only commits if the request handler didn't already commit.
     Read-only GET requests no longer trigger a needless COMMIT round-trip.
     """
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
             # commit is a no-op if nothing was written (read-only requests)
@@ -81,10 +180,40 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency for pure-read endpoints — binds to the replica
+    engine when configured. No commit: these handlers never write.
+    """
+    async with get_read_sessionmaker()() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_autocommit_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for short read-only aggregation handlers (health, logs,
+    metrics, admin stats). AUTOCOMMIT skips the implicit BEGIN/COMMIT
+    around each SELECT, so the connection does no transaction bookkeeping
+    and goes back to the small Neon pool sooner. Not for streaming reads —
+    server-side cursors need a transaction.
+    """
+    async with get_read_sessionmaker()() as session:
+        await session.connection(
+            execution_options={"isolation_level": "AUTOCOMMIT"}
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 @asynccontextmanager
 async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
     """Context manager version for use outside FastAPI (Celery worker)."""
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
             if session.in_transaction():
@@ -99,19 +228,40 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
 async def init_db():
     """Create all tables. Safe to call on every startup (CREATE TABLE IF NOT EXISTS)."""
     from db.models import Base
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("✓ All tables verified/created in Neon PostgreSQL")
 
 
+# Single-flight cache for the health probe. Load balancers and uptime
+# monitors can hit /health many times a second per instance; each probe
+# used to check out one of the five pooled connections for a SELECT 1.
+# Concurrent probes within the window now share one round-trip.
+_HEALTH_TTL = 5.0
+_health_cache = {"t": 0.0, "ok": True}
+_health_lock = None  # created lazily on the serving loop
+
+
 async def check_db_health() -> bool:
     """Quick liveness probe — used by /health endpoint."""
-    try:
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
-        return True
-    except Exception as e:
-        logger.error("DB health check failed: %s", e)
-        return False
+    global _health_lock
+    if time.monotonic() - _health_cache["t"] < _HEALTH_TTL:
+        return _health_cache["ok"]
+    if _health_lock is None:
+        _health_lock = asyncio.Lock()
+    async with _health_lock:
+        # Another probe may have refreshed while we waited for the lock.
+        if time.monotonic() - _health_cache["t"] < _HEALTH_TTL:
+            return _health_cache["ok"]
+        try:
+            async with get_sessionmaker()() as session:
+                await session.execute(text("SELECT 1"))
+            ok = True
+        except Exception as e:
+            logger.error("DB health check failed: %s", e)
+            ok = False
+        _health_cache["ok"] = ok
+        _health_cache["t"] = time.monotonic()
+        return ok
 
 
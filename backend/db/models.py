@@ -2,11 +2,11 @@ from datetime import datetime
 from datetime import datetime
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean,
+    Column, String, Integer, Float, Boolean, Computed, text,
     DateTime, ForeignKey, Text, JSON, BigInteger, Index, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 
 from db.base import Base
 
@@ -135,6 +135,12 @@ class Job(Base):
     __table_args__ = (
         Index("idx_jobs_org_status",   "organization_id", "status"),
         Index("idx_jobs_org_created",  "organization_id", "created_at"),
+        # Health monitoring: stuck-job detection filters status + started_at;
+        # the 24h failed/completed counts filter completed_at on just those
+        # two statuses, so a partial index keeps them off the full table.
+        Index("idx_jobs_status_started", "status", "started_at"),
+        Index("idx_jobs_completed", "completed_at",
+              postgresql_where=text("status IN ('failed', 'completed')")),
     )
 
 
@@ -208,8 +214,10 @@ class UsageLog(Base):
     created_at      = Column(DateTime, default=datetime.utcnow)
 
     __table_args__ = (
-        # FIX: was only individual indexes; billing query filters on BOTH columns
-        Index("idx_usage_org_time", "organization_id", "created_at"),
+        # FIX: was only individual indexes; billing query filters on BOTH columns.
+        # Trailing id makes the /logs keyset seek on (created_at, id) fully
+        # index-resolvable at any depth.
+        Index("idx_usage_org_time", "organization_id", "created_at", "id"),
         # FIX: job_id was unindexed — needed for per-job usage breakdown
         Index("idx_usage_job",      "job_id"),
     )
@@ -261,6 +269,18 @@ class Lead(Base):
     last_contacted_at = Column(DateTime, nullable=True)
     converted_at    = Column(DateTime, nullable=True)
 
+    # Generated search document — Postgres keeps it in sync, one GIN index
+    # serves the /leads search across all three identity columns.
+    search_tsv      = Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(company_name,'') || ' ' || "
+            "coalesce(contact_name,'') || ' ' || coalesce(email,''))",
+            persisted=True,
+        ),
+        nullable=True,
+    )
+
     conversations   = relationship("Conversation", back_populates="lead", cascade="all, delete-orphan")
     campaign_leads  = relationship("CampaignLead", back_populates="lead")
 
@@ -269,6 +289,7 @@ class Lead(Base):
         Index("idx_leads_org_status",     "organization_id", "status"),
         Index("idx_leads_org_created",    "organization_id", "created_at"),
         Index("idx_leads_email",          "email"),
+        Index("idx_leads_search_tsv", "search_tsv", postgresql_using="gin"),
     )
 
 
@@ -337,6 +358,8 @@ class Campaign(Base):
     __table_args__ = (
         Index("idx_campaigns_org",        "organization_id"),
         Index("idx_campaigns_org_status", "organization_id", "status"),
+        # Backs keyset pagination in /campaigns
+        Index("idx_campaigns_org_created", "organization_id", "created_at"),
     )
 
 
@@ -362,6 +385,10 @@ class CampaignLead(Base):
         Index("idx_cl_campaign", "campaign_id"),
         Index("idx_cl_lead",     "lead_id"),
         Index("idx_cl_status",   "campaign_id", "status"),
+        # send_campaign only ever scans pending rows, and most rows leave
+        # that state after sending — a partial index stays tiny.
+        Index("idx_cl_pending", "campaign_id",
+              postgresql_where=text("status = 'pending'")),
     )
 
 
@@ -386,4 +413,7 @@ class EmailLog(Base):
         Index("idx_emaillog_org",      "organization_id"),
         Index("idx_emaillog_campaign", "campaign_id"),
         Index("idx_emaillog_sent",     "organization_id", "sent_at"),
+        # /metrics counts sent/failed per org within a window — with status
+        # in the key the count is a tight index range scan.
+        Index("idx_emaillog_org_status_sent", "organization_id", "status", "sent_at"),
     )
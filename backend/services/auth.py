@@ -1,7 +1,8 @@
-import secrets, hashlib, re
+import secrets, hashlib, re, time
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -31,11 +32,25 @@ def create_access_token(data: dict, expires_delta=None) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+# Verified-token cache: signature verification runs once per token instead of
+# on every request. Entries are keyed by the raw token; the JWT's own exp is
+# still enforced on every hit, the short TTL just bounds memory.
+_TOKEN_CACHE = TTLCache(maxsize=8192, ttl=60)
+
+
 def decode_token(token: str) -> Optional[dict]:
+    payload = _TOKEN_CACHE.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        _TOKEN_CACHE.pop(token, None)
+        return None
     try:
-        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    _TOKEN_CACHE[token] = payload
+    return payload
 
 def generate_api_key():
     raw = f"aiq_sk_{secrets.token_urlsafe(32)}"
@@ -49,8 +64,33 @@ async def get_user_by_email(db, email):
     r = await db.execute(select(User).where(User.email == email))
     return r.scalar_one_or_none()
 
+# Auth-path lookup caches: get_user_by_id / get_org_by_api_key run before
+# every protected endpoint, and hot clients repeat them with identical args.
+# 10s TTL collapses sustained traffic to one DB round-trip per window.
+# Sessions use expire_on_commit=False, so cached (detached) rows stay readable.
+_USER_ID_CACHE = TTLCache(maxsize=8192, ttl=10)
+_ORG_KEY_CACHE = TTLCache(maxsize=4096, ttl=10)
+
+
+def invalidate_auth_caches(user_id: Optional[UUID] = None):
+    """Drop cached auth lookups after a credential change (password change,
+    API key revocation). Key-hash entries can't be targeted from a key id,
+    so the org cache is cleared wholesale — it refills within one TTL."""
+    if user_id is not None:
+        _USER_ID_CACHE.pop(user_id, None)
+    else:
+        _USER_ID_CACHE.clear()
+    _ORG_KEY_CACHE.clear()
+
+
 async def get_user_by_id(db, user_id):
-    return await db.get(User, user_id)
+    user = _USER_ID_CACHE.get(user_id)
+    if user is not None:
+        return user
+    user = await db.get(User, user_id)
+    if user is not None and user.is_active:
+        _USER_ID_CACHE[user_id] = user
+    return user
 
 async def authenticate_user(db, email, password):
     user = await get_user_by_email(db, email)
@@ -80,10 +120,17 @@ async def create_user(db, email, password, full_name, org_name):
 
 async def get_org_by_api_key(db, raw_key):
     kh = hash_api_key(raw_key)
+    org = _ORG_KEY_CACHE.get(kh)
+    if org is not None:
+        return org
     r = await db.execute(select(APIKey).where(APIKey.key_hash == kh).where(APIKey.is_active == True))
     ak = r.scalar_one_or_none()
     if not ak:
         return None
+    # Cache hits skip this write, so last_used_at advances at most once per TTL.
     ak.last_used_at = datetime.utcnow()
     await db.commit()
-    return await db.get(Organization, ak.organization_id)
+    org = await db.get(Organization, ak.organization_id)
+    if org is not None:
+        _ORG_KEY_CACHE[kh] = org
+    return org
@@ -13,6 +13,7 @@ _BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _BACKEND_ROOT not in sys.path:
     sys.path.insert(0, _BACKEND_ROOT)
 
+import asyncio
 import csv
 import io
 import logging
@@ -20,6 +21,7 @@ from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from uuid import UUID
 
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -151,7 +153,9 @@ async def import_leads_from_csv(
     already exists, we UPDATE it (upsert). Rows with no email and no
     company_name are skipped.
     """
-    raw_rows, warnings = parse_csv_bytes(content)
+    # Parsing and row mapping are pure CPU — run them in a worker thread so
+    # a 10MB upload doesn't stall every other request on this worker.
+    raw_rows, warnings = await asyncio.to_thread(parse_csv_bytes, content)
     errors: List[str] = []
     created = updated = skipped = 0
 
@@ -159,53 +163,62 @@ async def import_leads_from_csv(
         return {"created": 0, "updated": 0, "skipped": 0,
                 "warnings": warnings, "errors": errors or ["No valid rows found"]}
 
-    for row_num, row in enumerate(raw_rows, start=2):  # start=2 because row 1 = header
-        try:
-            lead_data = _map_row(row)
-
-            if not lead_data.get("company_name") and not lead_data.get("email"):
-                skipped += 1
-                warnings.append(f"Row {row_num}: skipped (no company or email)")
-                continue
+    def _map_all() -> List[Tuple[int, Dict]]:
+        mapped: List[Tuple[int, Dict]] = []
+        for row_num, row in enumerate(raw_rows, start=2):  # row 1 = header
+            try:
+                mapped.append((row_num, _map_row(row)))
+            except Exception as e:
+                errors.append(f"Row {row_num}: {e}")
+                logger.error("CSV import row %d error: %s", row_num, e)
+        return mapped
+
+    mapped_rows = await asyncio.to_thread(_map_all)
+
+    # One SELECT fetches every existing lead for the file's emails — the old
+    # loop ran a round-trip per row.
+    emails = {ld["email"] for _, ld in mapped_rows if ld.get("email")}
+    existing_by_email: Dict[str, Lead] = {}
+    if emails:
+        r = await db.execute(
+            select(Lead).where(
+                Lead.organization_id == organization_id,
+                Lead.email.in_(emails),
+            )
+        )
+        existing_by_email = {l.email: l for l in r.scalars()}
+
+    new_leads: List[Lead] = []
+    for row_num, lead_data in mapped_rows:
+        if not lead_data.get("company_name") and not lead_data.get("email"):
+            skipped += 1
+            warnings.append(f"Row {row_num}: skipped (no company or email)")
+            continue
 
-            # Upsert by email within org
-            existing = None
+        existing = existing_by_email.get(lead_data["email"]) if lead_data.get("email") else None
+        if existing:
+            # Update existing lead with any new data
+            for field, value in lead_data.items():
+                if value and not getattr(existing, field, None):
+                    setattr(existing, field, value)
+            updated += 1
+        else:
+            lead = Lead(
+                organization_id=organization_id,
+                created_by_id=created_by_id,
+                source=source,
+                **lead_data,
+            )
+            new_leads.append(lead)
             if lead_data.get("email"):
-                r = await db.execute(
-                    select(Lead).where(
-                        Lead.organization_id == organization_id,
-                        Lead.email == lead_data["email"]
-                    )
-                )
-                existing = r.scalar_one_or_none()
-
-            if existing:
-                # Update existing lead with any new data
-                for field, value in lead_data.items():
-                    if value and not getattr(existing, field, None):
-                        setattr(existing, field, value)
-                existing.updated_at = datetime.utcnow()
-                updated += 1
-                logger.info("Lead updated (email=%s)", lead_data.get("email"))
-            else:
-                lead = Lead(
-                    organization_id=organization_id,
-                    created_by_id=created_by_id,
-                    source=source,
-                    **lead_data,
-                )
-                db.add(lead)
-                created += 1
-
-            if (created + updated) % 50 == 0:
-                await db.flush()
-
-        except Exception as e:
-            errors.append(f"Row {row_num}: {e}")
-            logger.error("CSV import row %d error: %s", row_num, e)
-            continue
+                # Later rows with the same email update this one instead of
+                # inserting a duplicate.
+                existing_by_email[lead_data["email"]] = lead
+            created += 1
 
+    db.add_all(new_leads)
     await db.commit()
+    invalidate_pipeline_cache(organization_id)
     logger.info(
         "CSV import complete: %d created, %d updated, %d skipped, %d errors",
         created, updated, skipped, len(errors),
@@ -276,7 +289,6 @@ async def update_lead_status(
 
     old_status = lead.status
     lead.status = new_status
-    lead.updated_at = datetime.utcnow()
 
     if new_status == "contacted" and old_status == "new":
         lead.last_contacted_at = datetime.utcnow()
@@ -284,12 +296,27 @@ async def update_lead_status(
         lead.converted_at = datetime.utcnow()
 
     await db.commit()
+    invalidate_pipeline_cache(lead.organization_id)
     logger.info("Lead %s: %s → %s", lead.id, old_status, new_status)
     return lead
 
 
+# Dashboards poll the pipeline view aggressively; a 10s TTL collapses that
+# to one GROUP BY per org per window. Lead writes invalidate eagerly so the
+# kanban reflects a change on the next poll.
+_PIPELINE_CACHE = TTLCache(maxsize=1024, ttl=10)
+
+
+def invalidate_pipeline_cache(organization_id: UUID) -> None:
+    """Drop the cached summary after a lead create/update/delete/import."""
+    _PIPELINE_CACHE.pop(organization_id, None)
+
+
 async def get_pipeline_summary(db: AsyncSession, organization_id: UUID) -> Dict:
     """Return count per status for the pipeline kanban view."""
+    cached = _PIPELINE_CACHE.get(organization_id)
+    if cached is not None:
+        return cached
     rows = await db.execute(
         select(Lead.status, func.count(Lead.id))
         .where(Lead.organization_id == organization_id)
@@ -298,4 +325,5 @@ async def get_pipeline_summary(db: AsyncSession, organization_id: UUID) -> Dict:
     summary = {s: 0 for s in VALID_STATUSES}
     for status, count in rows:
         summary[status] = count
+    _PIPELINE_CACHE[organization_id] = summary
     return summary
@@ -45,9 +45,18 @@ import asyncio, logging
 from datetime import datetime
 from uuid import UUID
 
+# uvloop makes the fresh loops run_async() spins up per task meaningfully
+# faster (asyncpg and redis-py are socket-bound). The API process gets it
+# automatically from uvicorn[standard]; Celery needs the policy set here.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from celery import Celery
 from celery.exceptions import SoftTimeLimitExceeded
-from sqlalchemy import update, text
+from sqlalchemy import insert, update, text
 from core.config import settings
 
 import os
@@ -121,11 +130,14 @@ def run_async(coro):
 
 # ── Helper: enqueue with Redis-down guard ─────────────────────────────────────
 
-def enqueue_job(job_id: str, organization_id: str) -> str:
+def enqueue_job(job_id: str, organization_id: str, task_id: str = None) -> str:
     """
     Dispatch enrich_job_task to Celery.
     Returns the Celery task ID.
 
+    Pass task_id to use a client-generated id — lets the caller persist
+    celery_task_id in the same INSERT as the Job row.
+
     Raises RuntimeError if broker is unreachable — call site should
     catch this and return HTTP 503 to the client.
 
@@ -137,6 +149,7 @@ def enqueue_job(job_id: str, organization_id: str) -> str:
         result = enrich_job_task.apply_async(
             args=[job_id, organization_id],
             queue="enrichment",
+            task_id=task_id,
         )
         logger.info("Job %s enqueued → Celery task %s", job_id, result.id)
         return result.id
@@ -163,9 +176,11 @@ def enrich_job_task(self, job_id: str, organization_id: str):
       Exception             → job marked 'failed', retried up to max_retries=3
       Worker crash          → task re-queued by broker (task_acks_late=True)
     """
+    from core.rate_limiter import release_job_slot_sync
     logger.info("Starting job %s (attempt %d/%d)", job_id, self.request.retries + 1, self.max_retries + 1)
     try:
         run_async(_run_job(self, job_id, organization_id))
+        release_job_slot_sync(organization_id)
     except SoftTimeLimitExceeded:
         # FIX: was unhandled — job would stay as 'running' forever after 1h
         logger.warning("Job %s hit 1h soft time limit — marking as partial", job_id)
@@ -174,6 +189,7 @@ def enrich_job_task(self, job_id: str, organization_id: str):
             "Time limit exceeded (1 hour). Partial results are saved. "
             "Re-launch the job with the remaining companies to continue."
         ))
+        release_job_slot_sync(organization_id)
     except Exception as exc:
         logger.error("Job %s failed (attempt %d): %s", job_id, self.request.retries + 1, exc)
         if self.request.retries < self.max_retries:
@@ -181,6 +197,7 @@ def enrich_job_task(self, job_id: str, organization_id: str):
             raise self.retry(exc=exc, countdown=60)
         # Final failure — no more retries
         run_async(_mark_job_failed(job_id, str(exc)))
+        release_job_slot_sync(organization_id)
         raise
 
 
@@ -243,12 +260,47 @@ async def _run_job(task, job_id: str, organization_id: str):
     completed = 0
     failed    = 0
 
+    # Per-batch accumulators. Usage logs, failure rows, and the jobs
+    # progress increment are flushed once per WORKER_COMMIT_BATCH_SIZE
+    # companies — executemany collapses each batch into a single INSERT
+    # round-trip instead of one statement per row.
+    usage_rows:   list = []
+    failure_rows: list = []
+    batch_completed = 0
+    batch_failed    = 0
+
+    async def _flush_batch():
+        nonlocal batch_completed, batch_failed
+        if not (usage_rows or failure_rows):
+            return
+        async with get_db_context() as db:
+            if usage_rows:
+                await db.execute(insert(UsageLog), usage_rows)
+            if failure_rows:
+                await db.execute(insert(EnrichmentResult), failure_rows)
+            # Atomic SQL increment — safe under retries
+            await db.execute(
+                text("""
+                    UPDATE jobs
+                    SET completed_items = completed_items + :done,
+                        failed_items    = failed_items + :bad,
+                        credits_used    = credits_used + :done,
+                        progress_pct    = (completed_items + failed_items + :done + :bad)::float
+                                          / total_items * 100
+                    WHERE id = :job_id
+                """),
+                {"done": batch_completed, "bad": batch_failed, "job_id": job_id},
+            )
+        usage_rows.clear()
+        failure_rows.clear()
+        batch_completed = batch_failed = 0
+
     # Phase 2: Enrich — one fresh session per company
     for i, company in enumerate(companies):
         website_hint = websites.get(company) or websites.get(str(i))
 
-        async with get_db_context() as db:
-            try:
+        try:
+            async with get_db_context() as db:
                 await agent.enrich_company(
                     db=db,
                     job_id=UUID(job_id),
@@ -256,60 +308,38 @@ async def _run_job(task, job_id: str, organization_id: str):
                     company_name=company,
                     website_hint=website_hint,
                 )
-                completed += 1
-
-                db.add(UsageLog(
-                    organization_id=UUID(organization_id),
-                    job_id=UUID(job_id),
-                    action="enrichment",
-                    credits_consumed=1,
-                    tokens_used=0,
-                    model_used=settings.GROQ_MODEL,
-                    extra_data={"company": company, "source": "batch_job"},
-                ))
-
-                # Atomic SQL increment — safe under retries
-                await db.execute(
-                    text("""
-                        UPDATE jobs
-                        SET completed_items = completed_items + 1,
-                            progress_pct    = (completed_items + 1)::float / total_items * 100,
-                            credits_used    = credits_used + 1
-                        WHERE id = :job_id
-                    """),
-                    {"job_id": job_id},
-                )
-
-            except Exception as e:
-                failed += 1
-                logger.error("Enrichment failed for '%s': %s", company, e)
-
-                db.add(EnrichmentResult(
-                    job_id=UUID(job_id),
-                    organization_id=UUID(organization_id),
-                    input_name=company,
-                    status="failed",
-                    error_message=str(e)[:500],
-                    enriched_at=datetime.utcnow(),
-                ))
-
-                await db.execute(
-                    text("""
-                        UPDATE jobs
-                        SET failed_items = failed_items + 1,
-                            progress_pct = (completed_items + failed_items + 1)::float / total_items * 100
-                        WHERE id = :job_id
-                    """),
-                    {"job_id": job_id},
-                )
-
-            # Batch commit
-            if (i + 1) % settings.WORKER_COMMIT_BATCH_SIZE == 0 or (i + 1) == total:
-                await db.commit()
-                logger.info(
-                    "Job %s: %d/%d (%.0f%%)",
-                    job_id, i + 1, total, ((i + 1) / total) * 100,
-                )
+            completed += 1
+            batch_completed += 1
+            usage_rows.append({
+                "organization_id": UUID(organization_id),
+                "job_id": UUID(job_id),
+                "action": "enrichment",
+                "credits_consumed": 1,
+                "tokens_used": 0,
+                "model_used": settings.GROQ_MODEL,
+                "extra_data": {"company": company, "source": "batch_job"},
+            })
+
+        except Exception as e:
+            failed += 1
+            batch_failed += 1
+            logger.error("Enrichment failed for '%s': %s", company, e)
+            failure_rows.append({
+                "job_id": UUID(job_id),
+                "organization_id": UUID(organization_id),
+                "input_name": company,
+                "status": "failed",
+                "error_message": str(e)[:500],
+                "enriched_at": datetime.utcnow(),
+            })
+
+        # Batch flush + commit
+        if (i + 1) % settings.WORKER_COMMIT_BATCH_SIZE == 0 or (i + 1) == total:
+            await _flush_batch()
+            logger.info(
+                "Job %s: %d/%d (%.0f%%)",
+                job_id, i + 1, total, ((i + 1) / total) * 100,
+            )
 
         # Brief pause between companies — Groq rate limit respect
         await asyncio.sleep(2)